@@ -24,6 +24,11 @@ import tempest.test
 CONF = config.CONF
 BAD_REQUEST_RETRIES = 3
 
+# Import methods, stores and schema documents are static per deployment,
+# so cache them per endpoint instead of re-fetching them from the server
+# in every test class that needs them.
+_discovery_cache = {}
+
 
 class BaseImageTest(tempest.test.BaseTestCase):
     """Base test class for Image API tests."""
@@ -82,6 +87,20 @@ class BaseV2ImageTest(BaseImageTest):
         cls.schemas_client = cls.os_primary.schemas_client
         cls.versions_client = cls.os_primary.image_versions_client
 
+    @classmethod
+    def resource_setup(cls):
+        super(BaseV2ImageTest, cls).resource_setup()
+        # Cache the config values the image tests use on nearly every
+        # request; oslo.config attribute access goes through descriptors
+        # and adds up in helpers that run per test
+        cls.name_prefix = CONF.resource_name_prefix
+        cls.default_container_format = CONF.image.container_formats[0]
+        cls.default_disk_format = CONF.image.disk_formats[0]
+        cls.http_image = CONF.image.http_image
+        # Distinct-URL variants of http_image used by the location tests
+        cls.http_image_new = cls.http_image + '#new'
+        cls.http_image_new3 = cls.http_image + '#new3'
+
     def create_namespace(self, namespace_name=None, visibility='public',
                          description='Tempest', protected=False,
                          **kwargs):
@@ -99,8 +118,8 @@ class BaseV2ImageTest(BaseImageTest):
     def create_and_stage_image(self, all_stores=False):
         """Create Image & stage image file for glance-direct import method."""
         image_name = data_utils.rand_name('test-image')
-        container_format = CONF.image.container_formats[0]
-        disk_format = CONF.image.disk_formats[0]
+        container_format = self.default_container_format
+        disk_format = self.default_disk_format
         image = self.create_image(name=image_name,
                                   container_format=container_format,
                                   disk_format=disk_format,
@@ -126,14 +145,33 @@ class BaseV2ImageTest(BaseImageTest):
 
         return body, stores_list
 
+    @classmethod
+    def get_schema(cls, schema):
+        """Return the named schema document, cached per endpoint."""
+        key = (cls.schemas_client.base_url, 'schema', schema)
+        if key not in _discovery_cache:
+            _discovery_cache[key] = cls.schemas_client.show_schema(schema)
+        return _discovery_cache[key]
+
+    @classmethod
+    def get_available_import_methods(cls):
+        key = (cls.client.base_url, 'import-methods')
+        if key not in _discovery_cache:
+            _discovery_cache[key] = cls.client.info_import()[
+                'import-methods']['value']
+        return _discovery_cache[key]
+
     @classmethod
     def get_available_stores(cls):
-        stores = []
-        try:
-            stores = cls.client.info_stores()['stores']
-        except exceptions.NotFound:
-            pass
-        return stores
+        key = (cls.client.base_url, 'stores')
+        if key not in _discovery_cache:
+            stores = []
+            try:
+                stores = cls.client.info_stores()['stores']
+            except exceptions.NotFound:
+                pass
+            _discovery_cache[key] = stores
+        return _discovery_cache[key]
 
     def _update_image_with_retries(self, image, patch):
         # NOTE(danms): If glance was unable to fetch the remote image via
@@ -160,7 +198,7 @@ class BaseV2ImageTest(BaseImageTest):
 
         # Add a new location
         new_loc = {'metadata': {'foo': 'bar'},
-                   'url': CONF.image.http_image}
+                   'url': self.http_image}
         self._update_image_with_retries(image['id'], [
             dict(add='/locations/-', value=new_loc)])
 
@@ -187,7 +225,7 @@ class BaseV2ImageTest(BaseImageTest):
         image = self.check_set_location()
 
         new_loc = {'metadata': {'speed': '88mph'},
-                   'url': '%s#new' % CONF.image.http_image}
+                   'url': self.http_image_new}
         self._update_image_with_retries(image['id'],
                                         [dict(add='/locations/-',
                                               value=new_loc)])
@@ -77,7 +77,7 @@ class BasicOperationsImagesAdminTest(base.BaseV2ImageAdminTest):
         self.addCleanup(self.admin_client.delete_image, image['id'])
 
         images_list = self.client.list_images()['images']
-        fetched_images_id = [img['id'] for img in images_list]
+        fetched_images_id = {img['id'] for img in images_list}
         self.assertIn(image['id'], fetched_images_id)
 
 
@@ -100,8 +100,7 @@ class ImportCopyImagesTest(base.BaseV2ImageAdminTest):
         verify that import succeeded.
         """
         available_stores = self.get_available_stores()
-        available_import_methods = self.client.info_import()[
-            'import-methods']['value']
+        available_import_methods = self.get_available_import_methods()
         # NOTE(gmann): Skip if copy-image import method and multistore
         # are not available.
         if ('copy-image' not in available_import_methods or
@@ -194,8 +193,7 @@ class MultiStoresImagesTest(base.BaseV2ImageAdminTest, base.BaseV2ImageTest):
     @classmethod
     def resource_setup(cls):
         super(MultiStoresImagesTest, cls).resource_setup()
-        cls.available_import_methods = \
-            cls.client.info_import()['import-methods']['value']
+        cls.available_import_methods = cls.get_available_import_methods()
         if not cls.available_import_methods:
             raise cls.skipException('Server does not support '
                                     'any import method')
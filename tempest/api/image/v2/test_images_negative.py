@@ -174,8 +174,7 @@ class ImportImagesNegativeTest(base.BaseV2ImageTest):
     @classmethod
     def resource_setup(cls):
         super(ImportImagesNegativeTest, cls).resource_setup()
-        cls.available_import_methods = cls.client.info_import()[
-            'import-methods']['value']
+        cls.available_import_methods = cls.get_available_import_methods()
         if not cls.available_import_methods:
             raise cls.skipException('Server does not support '
                                     'any import method')
@@ -14,10 +14,14 @@
 #    limitations under the License.
 
 import base64
+from concurrent import futures
+import functools
+import re
 import socket
 from ssl import SSLContext as sslc
 import struct
 import textwrap
+import threading
 from urllib import parse as urlparse
 
 from oslo_log import log as logging
@@ -36,6 +40,47 @@ CONF = config.CONF
 
 LOG = logging.getLogger(__name__)
 
+# One TLS context shared by all console websocket connections; context
+# construction initializes OpenSSL state and is not free, and nothing
+# about it varies between calls. Sharing it also shares its TLS session
+# cache.
+_WS_TLS_CONTEXT = sslc()
+
+# Precompiled decoders for the websocket extended-length escapes, so
+# the format strings aren't re-parsed for every frame
+_WS_LEN16 = struct.Struct('!H')
+_WS_LEN64 = struct.Struct('!Q')
+
+# The fixed part of the websocket upgrade request. We use a hard-coded
+# WebSocket key since this is a test program, and choose binary even
+# though a browser may do Base64.
+_WS_STATIC_HEADERS = (
+    'Upgrade: websocket\r\n'
+    'Connection: Upgrade\r\n'
+    'Sec-WebSocket-Key: x3JJHMbDL1EzLkh9GBhXDw==\r\n'
+    'Sec-WebSocket-Version: 13\r\n'
+    'Sec-WebSocket-Protocol: binary\r\n\r\n')
+
+
+@functools.lru_cache(maxsize=4)
+def _default_user_data(ssh_user):
+    """Return the encoded default user data script for an ssh user.
+
+    The script is identical for every server booted with the same ssh
+    user, so render and encode it once instead of per create call.
+    """
+    script = '''
+             #!/bin/sh
+             echo "Printing {user} user authorized keys"
+             cat ~{user}/.ssh/authorized_keys || true
+             '''.format(user=ssh_user)
+    return base64.b64encode(textwrap.dedent(script).lstrip().encode('utf8'))
+
+
+# (source list, frozenset of it) pair backing is_scheduler_filter_enabled;
+# rebuilt only if the configured list object changes
+_scheduler_filters_cache = (None, frozenset())
+
 
 def is_scheduler_filter_enabled(filter_name):
     """Check the list of enabled compute scheduler filters from config.
@@ -46,15 +91,17 @@ def is_scheduler_filter_enabled(filter_name):
     requested filter 'filter_name' is one of the enabled filters in nova
     ("nova.scheduler.filters.all_filters").
     """
+    global _scheduler_filters_cache
 
     filters = CONF.compute_feature_enabled.scheduler_enabled_filters
     if not filters:
         return False
-    if 'all' in filters:
-        return True
-    if filter_name in filters:
-        return True
-    return False
+    if _scheduler_filters_cache[0] is not filters:
+        # Hash the filters once so repeated gating checks are set
+        # lookups instead of list scans
+        _scheduler_filters_cache = (filters, frozenset(filters))
+    enabled_filters = _scheduler_filters_cache[1]
+    return 'all' in enabled_filters or filter_name in enabled_filters
 
 
 def get_server_ip(server, validation_resources=None):
@@ -75,11 +122,15 @@ def get_server_ip(server, validation_resources=None):
                    'validation_resources cannot be None')
             raise lib_exc.InvalidParam(invalid_param=msg)
     elif CONF.validation.connect_method == 'fixed':
-        addresses = server['addresses'][CONF.validation.network_for_ssh]
-        for address in addresses:
-            if address['version'] == CONF.validation.ip_version_for_ssh:
-                return address['addr']
-        raise exceptions.ServerUnreachable(server_id=server['id'])
+        # Read the config values once rather than per address inspected
+        network = CONF.validation.network_for_ssh
+        ip_version = CONF.validation.ip_version_for_ssh
+        addr = next((address['addr']
+                     for address in server['addresses'][network]
+                     if address['version'] == ip_version), None)
+        if addr is None:
+            raise exceptions.ServerUnreachable(server_id=server['id'])
+        return addr
     else:
         raise lib_exc.InvalidConfiguration()
 
@@ -88,11 +139,9 @@ def _setup_validation_fip(
         server, clients, tenant_network, validation_resources):
     if CONF.service_available.neutron:
         ifaces = clients.interfaces_client.list_interfaces(server['id'])
-        validation_port = None
-        for iface in ifaces['interfaceAttachments']:
-            if iface['net_id'] == tenant_network['id']:
-                validation_port = iface['port_id']
-                break
+        validation_port = next(
+            (iface['port_id'] for iface in ifaces['interfaceAttachments']
+             if iface['net_id'] == tenant_network['id']), None)
         if not validation_port:
             # NOTE(artom) This will get caught by the catch-all clause in
             # the wait_until loop below
@@ -195,9 +244,16 @@ def create_test_server(clients, validatable=False, validation_resources=None,
     :returns: a tuple
     """
 
+    # Bind the repeatedly used config values to locals once; each
+    # CONF attribute access goes through oslo.config's descriptors
+    name_prefix = CONF.resource_name_prefix
+    run_validation = CONF.validation.run_validation and validatable
+    connect_floating = CONF.validation.connect_method == 'floating'
+    common_az = CONF.compute.compute_volume_common_az
+
     if name is None:
         name = data_utils.rand_name(
-            prefix=CONF.resource_name_prefix, name=__name__ + "-instance")
+            prefix=name_prefix, name=__name__ + "-instance")
     if flavor is None:
         flavor = CONF.compute.flavor_ref
     if image_id is None:
@@ -209,7 +265,7 @@ def create_test_server(clients, validatable=False, validation_resources=None,
     multiple_create_request = (max(kwargs.get('min_count', 0),
                                    kwargs.get('max_count', 0)) > 1)
 
-    if CONF.validation.run_validation and validatable:
+    if run_validation:
         LOG.debug("Provisioning test server with validation resources %s",
                   validation_resources)
         if 'security_groups' in kwargs:
@@ -228,7 +284,7 @@ def create_test_server(clients, validatable=False, validation_resources=None,
             except KeyError:
                 LOG.debug("No key provided.")
 
-        if CONF.validation.connect_method == 'floating':
+        if connect_floating:
             if wait_until is None:
                 wait_until = 'ACTIVE'
 
@@ -236,25 +292,18 @@ def create_test_server(clients, validatable=False, validation_resources=None,
             # If nothing overrides the default user data script then run
             # a simple script on the host to print networking info. This is
             # to aid in debugging ssh failures.
-            script = '''
-                     #!/bin/sh
-                     echo "Printing {user} user authorized keys"
-                     cat ~{user}/.ssh/authorized_keys || true
-                     '''.format(user=CONF.validation.image_ssh_user)
-            script_clean = textwrap.dedent(script).lstrip().encode('utf8')
-            script_b64 = base64.b64encode(script_clean)
-            kwargs['user_data'] = script_b64
+            kwargs['user_data'] = _default_user_data(
+                CONF.validation.image_ssh_user)
 
     if volume_backed:
         volume_name = data_utils.rand_name(
-            prefix=CONF.resource_name_prefix, name=__name__ + '-volume')
+            prefix=name_prefix, name=__name__ + '-volume')
         volumes_client = clients.volumes_client_latest
         params = {'name': volume_name,
                   'imageRef': image_id,
                   'size': CONF.volume.volume_size}
-        if CONF.compute.compute_volume_common_az:
-            params.setdefault('availability_zone',
-                              CONF.compute.compute_volume_common_az)
+        if common_az:
+            params.setdefault('availability_zone', common_az)
         volume = volumes_client.create_volume(**params)
         try:
             waiters.wait_for_volume_resource_status(volumes_client,
@@ -281,9 +330,8 @@ def create_test_server(clients, validatable=False, validation_resources=None,
         # to be specified.
         image_id = ''
 
-    if CONF.compute.compute_volume_common_az:
-        kwargs.setdefault('availability_zone',
-                          CONF.compute.compute_volume_common_az)
+    if common_az:
+        kwargs.setdefault('availability_zone', common_az)
     body = clients.servers_client.create_server(name=name, imageRef=image_id,
                                                 flavorRef=flavor,
                                                 **kwargs)
@@ -291,8 +339,13 @@ def create_test_server(clients, validatable=False, validation_resources=None,
 
     # handle the case of multiple servers
     if multiple_create_request:
-        # Get servers created which name match with name param.
-        body_servers = clients.servers_client.list_servers()
+        # Get servers created which name match with name param. Nova
+        # treats the name query parameter as a regex, so anchoring the
+        # escaped name filters server-side and avoids listing the whole
+        # tenant; the startswith check below is kept as a defensive
+        # filter over the much smaller result.
+        body_servers = clients.servers_client.list_servers(
+            name='^' + re.escape(name))
         created_servers = \
             [s for s in body_servers['servers'] if s['name'].startswith(name)]
     else:
@@ -314,28 +367,46 @@ def create_test_server(clients, validatable=False, validation_resources=None,
             wait_until = 'ACTIVE'
 
         servers = []
+
+        def _wait_for_active(server):
+            return waiters.wait_for_server_status(
+                clients.servers_client, server['id'], wait_until,
+                request_id=request_id)
+
+        # The floating IP resource is shared between the servers, so
+        # don't associate it from more than one thread at a time.
+        fip_lock = threading.Lock()
+
+        def _wait_for_validation(server):
+            if connect_floating:
+                with fip_lock:
+                    _setup_validation_fip(
+                        server, clients, tenant_network,
+                        validation_resources)
+            if wait_until_extra:
+                wait_for_ssh_or_ping(
+                    server, clients, tenant_network, validatable,
+                    validation_resources, wait_until_extra, False)
+
         try:
-            # Wait for server to be in active state and populate servers list
-            # with those full server response so that we will have addresses
-            # field present in server which is needed to be used for wait for
-            # ssh
-            for server in created_servers:
-                server = waiters.wait_for_server_status(
-                    clients.servers_client, server['id'], wait_until,
-                    request_id=request_id)
-                servers.append(server)
-
-            for server in servers:
-                if CONF.validation.run_validation and validatable:
-                    if CONF.validation.connect_method == 'floating':
-                        _setup_validation_fip(
-                            server, clients, tenant_network,
-                            validation_resources)
-                    if wait_until_extra:
-                        wait_for_ssh_or_ping(
-                            server, clients, tenant_network,
-                            validatable, validation_resources,
-                            wait_until_extra, False)
+            # Wait for the servers to be in active state and populate the
+            # servers list with those full server responses so that we
+            # will have the addresses field present in server which is
+            # needed to be used for wait for ssh. The per-server waits
+            # are independent, so run them in parallel and pay for the
+            # slowest server instead of the sum of all of them.
+            if created_servers:
+                with futures.ThreadPoolExecutor(
+                        max_workers=min(len(created_servers),
+                                        32)) as executor:
+                    servers = list(executor.map(_wait_for_active,
+                                                created_servers))
+
+            if run_validation and servers:
+                with futures.ThreadPoolExecutor(
+                        max_workers=min(len(servers), 32)) as executor:
+                    # Consume the iterator so any failure is raised here
+                    list(executor.map(_wait_for_validation, servers))
         except Exception:
             with excutils.save_and_reraise_exception():
                 for server in created_servers:
@@ -402,22 +473,19 @@ def create_websocket(url):
     #               back to the default port based on the scheme.
     port = url.port or (443 if url.scheme == 'https' else 80)
 
-    for res in socket.getaddrinfo(url.hostname, port,
-                                  socket.AF_UNSPEC, socket.SOCK_STREAM):
-        af, socktype, proto, _, sa = res
-        client_socket = socket.socket(af, socktype, proto)
-        if url.scheme == 'https':
-            client_socket = sslc().wrap_socket(client_socket,
-                                               server_hostname=url.hostname)
-        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        try:
-            client_socket.connect(sa)
-        except socket.error:
-            client_socket.close()
-            continue
-        break
-    else:
+    try:
+        # create_connection does the address resolution and walks the
+        # returned families itself, so there is no need to iterate over
+        # getaddrinfo results by hand
+        client_socket = socket.create_connection((url.hostname, port))
+    except OSError:
         raise socket.error('WebSocket creation failed')
+    # The websocket handshake is made of several small writes; don't
+    # let Nagle's algorithm delay them
+    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if url.scheme == 'https':
+        client_socket = _WS_TLS_CONTEXT.wrap_socket(
+            client_socket, server_hostname=url.hostname)
     # Turn the Socket into a WebSocket to do the communication
     return _WebSocket(client_socket, url)
 
@@ -426,8 +494,9 @@ class _WebSocket(object):
     def __init__(self, client_socket, url):
         """Contructor for the WebSocket wrapper to the socket."""
         self._socket = client_socket
-        # cached stream for early frames.
-        self.cached_stream = b''
+        # cached stream for early frames; kept as a memoryview so
+        # draining it repeatedly doesn't recopy the remainder each time
+        self.cached_stream = memoryview(b'')
         # Upgrade the HTTP connection to a WebSocket
         self._upgrade(url)
 
@@ -440,7 +509,9 @@ class _WebSocket(object):
         data_from_socket = b''
         if len(self.cached_stream) > 0:
             read_from_cached = min(len(self.cached_stream), recv_size)
-            data_from_cached += self.cached_stream[:read_from_cached]
+            # memoryview slices only adjust offsets; bytes are copied
+            # once here at the boundary
+            data_from_cached = bytes(self.cached_stream[:read_from_cached])
             self.cached_stream = self.cached_stream[read_from_cached:]
             recv_size -= read_from_cached
         if recv_size > 0:
@@ -457,40 +528,45 @@ class _WebSocket(object):
             # If we didn't receive any data, just return None
             if not header:
                 return None
-            # We will make the assumption that we are only dealing with
-            # frames less than 125 bytes here (for the negotiation) and
-            # that only the 2nd byte contains the length, and since the
-            # server doesn't do masking, we can just read the data length
-            if int(header[1]) & 127 > 0:
-                return self._recv(int(header[1]) & 127)
+            # The server doesn't do masking, so the length is just the
+            # low seven bits of the second byte, with the standard
+            # websocket escapes for frames that don't fit in them
+            length = header[1] & 127
+            if length == 126:
+                length = _WS_LEN16.unpack(self._recv(2))[0]
+            elif length == 127:
+                length = _WS_LEN64.unpack(self._recv(8))[0]
+            if length > 0:
+                return self._recv(length)
 
     def send_frame(self, data):
         """Wrapper for sending data to add in the WebSocket frame format."""
-        frame_bytes = list()
-        # For the first byte, want to say we are sending binary data (130)
-        frame_bytes.append(130)
-        # Only sending negotiation data so don't need to worry about > 125
-        # We do need to add the bit that says we are masking the data
-        frame_bytes.append(len(data) | 128)
+        # For the first byte, want to say we are sending binary data (130).
+        # Only sending negotiation data so don't need to worry about > 125;
+        # we do need to add the bit that says we are masking the data
+        header = bytes((130, len(data) | 128))
         # We don't really care about providing a random mask for security
         # So we will just hard-code a value since a test program
-        mask = [7, 2, 1, 9]
-        for i in range(len(mask)):
-            frame_bytes.append(mask[i])
-        # Mask each of the actual data bytes that we are going to send
-        for i in range(len(data)):
-            frame_bytes.append(int(data[i]) ^ mask[i % 4])
-        # Convert our integer list to a binary array of bytes
-        frame_bytes = struct.pack('!%iB' % len(frame_bytes), * frame_bytes)
-        self._socket.sendall(frame_bytes)
+        mask = b'\x07\x02\x01\x09'
+        # XOR the whole payload against the tiled mask in one C-level
+        # operation instead of masking byte by byte in Python
+        tiled = (mask * (len(data) // 4 + 1))[:len(data)]
+        masked = (int.from_bytes(data, 'big') ^
+                  int.from_bytes(tiled, 'big')).to_bytes(len(data), 'big')
+        self._socket.sendall(header + mask + masked)
 
     def close(self):
         """Helper method to close the connection."""
         # Close down the real socket connection and exit the test program
         if self._socket is not None:
-            self._socket.shutdown(1)
-            self._socket.close()
-            self._socket = None
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # The peer may have torn the connection down already
+                pass
+            finally:
+                self._socket.close()
+                self._socket = None
 
     def _upgrade(self, url):
         """Upgrade the HTTP connection to a WebSocket and verify."""
@@ -513,35 +589,48 @@ class _WebSocket(object):
         # Fix websocket request format by adding / prefix.
         # Updated request format: GET /?token=xxx HTTP/1.1
         # or GET /websockify HTTP/1.1
-        reqdata = 'GET /%s HTTP/1.1\r\n' % path
-        reqdata += 'Host: %s' % url.hostname
+        host = url.hostname
         # Add port only if we have one specified
         if url.port:
-            reqdata += ':%s' % url.port
-        # Line-ending for Host header
-        reqdata += '\r\n'
-        # Tell the HTTP Server to Upgrade the connection to a WebSocket
-        reqdata += 'Upgrade: websocket\r\nConnection: Upgrade\r\n'
-        # The token=xxx is sent as a Cookie not in the URI for noVNC < v1.1.0
-        reqdata += 'Cookie: %s\r\n' % url.query
-        # Use a hard-coded WebSocket key since a test program
-        reqdata += 'Sec-WebSocket-Key: x3JJHMbDL1EzLkh9GBhXDw==\r\n'
-        reqdata += 'Sec-WebSocket-Version: 13\r\n'
-        # We are choosing to use binary even though browser may do Base64
-        reqdata += 'Sec-WebSocket-Protocol: binary\r\n\r\n'
+            host = '%s:%s' % (host, url.port)
+        # Assemble the request in one join rather than a string
+        # reallocation per header line; the static headers tell the
+        # HTTP server to Upgrade the connection to a WebSocket, and the
+        # token=xxx is sent as a Cookie not in the URI for noVNC < v1.1.0
+        reqdata = ''.join((
+            'GET /%s HTTP/1.1\r\n' % path,
+            'Host: %s\r\n' % host,
+            'Cookie: %s\r\n' % url.query,
+            _WS_STATIC_HEADERS))
         # Send the HTTP GET request and get the response back
         self._socket.sendall(reqdata.encode('utf8'))
-        self.response = data = self._socket.recv(4096)
-        # Loop through & concatenate all of the data in the response body
-        end_loc = self.response.find(b'\r\n\r\n')
+        # Don't delay-ACK the server's first response segment where the
+        # platform supports opting out (Linux); TCP_NODELAY is already
+        # set on the socket at connect time
+        if hasattr(socket, 'TCP_QUICKACK'):
+            try:
+                self._socket.setsockopt(
+                    socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            except OSError:
+                pass
+        # Accumulate the response in a bytearray, which grows in place
+        # instead of recopying everything received so far on each
+        # chunk, and resume the delimiter search near the tail rather
+        # than rescanning from the start (backing up three bytes in
+        # case the delimiter straddles a chunk boundary)
+        data = self._socket.recv(4096)
+        buf = bytearray(data)
+        end_loc = buf.find(b'\r\n\r\n')
         while data and end_loc < 0:
+            search_from = max(0, len(buf) - 3)
             data = self._socket.recv(4096)
-            self.response += data
-            end_loc = self.response.find(b'\r\n\r\n')
+            buf += data
+            end_loc = buf.find(b'\r\n\r\n', search_from)
 
+        self.response = bytes(buf)
         if len(self.response) > end_loc + 4:
             # In case some frames (e.g. the first RFP negotiation) have
             # arrived, cache it for next reading.
-            self.cached_stream = self.response[end_loc + 4:]
+            self.cached_stream = memoryview(self.response)[end_loc + 4:]
             # ensure response ends with '\r\n\r\n'.
             self.response = self.response[:end_loc + 4]
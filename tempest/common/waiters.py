@@ -11,6 +11,7 @@
 #    under the License.
 
 import os
+import random
 import re
 import time
 
@@ -261,6 +262,15 @@ def wait_for_image_imported_to_stores(client, image_id, stores=None):
                 'Image service has no store support; '
                 'cowardly refusing to wait for them.')
 
+    # NOTE: Poll with exponential backoff (plus a little jitter to
+    # desynchronize parallel workers) instead of a fixed interval. Fast
+    # imports are still caught by the short initial interval, while slow
+    # ones stop hammering show_image at a constant rate. The backoff is
+    # capped at a couple of build_intervals so a completion mid-wait is
+    # still noticed about as quickly as the fixed-interval poll noticed
+    # it, and the sleep never overshoots the deadline.
+    interval = 0.25
+    max_interval = max(client.build_interval * 2.0, interval)
     while int(time.time()) - start < client.build_timeout:
         image = client.show_image(image_id)
         if image['status'] == 'active' and (stores is None or
@@ -270,7 +280,12 @@ def wait_for_image_imported_to_stores(client, image_id, stores=None):
             exc_cls = lib_exc.OtherRestClientException
             break
 
-        time.sleep(client.build_interval)
+        remaining = client.build_timeout - (time.time() - start)
+        if remaining <= 0:
+            break
+        time.sleep(min(interval + random.uniform(0, interval / 10.0),
+                       remaining))
+        interval = min(interval * 2, max_interval)
 
     message = ('Image %s failed to import on stores: %s' %
                (image_id, str(image.get('os_glance_failed_import'))))
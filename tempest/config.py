@@ -221,7 +221,11 @@ ServiceClientsGroup = [
                help='Timeout in seconds to wait for the http request to '
                     'return'),
     cfg.StrOpt('proxy_url',
-               help='Specify an http proxy to use.')
+               help='Specify an http proxy to use.'),
+    cfg.BoolOpt('keep_alive',
+                default=False,
+                help='Reuse HTTP connections between service client '
+                     'requests instead of closing them per request.')
 ]
 
 identity_feature_group = cfg.OptGroup(name='identity-feature-enabled',
@@ -1542,6 +1546,7 @@ def service_client_config(service_client_name=None):
         * `trace_requests`
         * `http_timeout`
         * `proxy_url`
+        * `keep_alive`
 
     The dict returned by this does not fit a few service clients:
 
@@ -1566,6 +1571,7 @@ def service_client_config(service_client_name=None):
         'trace_requests': CONF.debug.trace_requests,
         'http_timeout': CONF.service_clients.http_timeout,
         'proxy_url': CONF.service_clients.proxy_url,
+        'keep_alive': CONF.service_clients.keep_alive,
     }
 
     if service_client_name is None:
@@ -259,13 +259,14 @@ class KeystoneAuthProvider(AuthProvider):
     def __init__(self, credentials, auth_url,
                  disable_ssl_certificate_validation=None,
                  ca_certs=None, trace_requests=None, scope='project',
-                 http_timeout=None, proxy_url=None):
+                 http_timeout=None, proxy_url=None, keep_alive=False):
         super(KeystoneAuthProvider, self).__init__(credentials, scope)
         self.dscv = disable_ssl_certificate_validation
         self.ca_certs = ca_certs
         self.trace_requests = trace_requests
         self.http_timeout = http_timeout
         self.proxy_url = proxy_url
+        self.keep_alive = keep_alive
         self.auth_url = auth_url
         self.auth_client = self._auth_client(auth_url)
 
@@ -344,7 +345,8 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         return json_v2id.TokenClient(
             auth_url, disable_ssl_certificate_validation=self.dscv,
             ca_certs=self.ca_certs, trace_requests=self.trace_requests,
-            http_timeout=self.http_timeout, proxy_url=self.proxy_url)
+            http_timeout=self.http_timeout, proxy_url=self.proxy_url,
+            keep_alive=self.keep_alive)
 
     def _auth_params(self):
         """Auth parameters to be passed to the token request
@@ -432,7 +434,8 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         return json_v3id.V3TokenClient(
             auth_url, disable_ssl_certificate_validation=self.dscv,
             ca_certs=self.ca_certs, trace_requests=self.trace_requests,
-            http_timeout=self.http_timeout, proxy_url=self.proxy_url)
+            http_timeout=self.http_timeout, proxy_url=self.proxy_url,
+            keep_alive=self.keep_alive)
 
     def _auth_params(self):
         """Auth parameters to be passed to the token request
@@ -606,7 +609,7 @@ def is_identity_version_supported(identity_version):
 def get_credentials(auth_url, fill_in=True, identity_version='v2',
                     disable_ssl_certificate_validation=None, ca_certs=None,
                     trace_requests=None, http_timeout=None, proxy_url=None,
-                    **kwargs):
+                    keep_alive=False, **kwargs):
     """Builds a credentials object based on the configured auth_version
 
     :param auth_url (string): Full URI of the OpenStack Identity API(Keystone)
@@ -625,6 +628,8 @@ def get_credentials(auth_url, fill_in=True, identity_version='v2',
     :param http_timeout: timeout in seconds to wait for the http request to
            return
     :param proxy_url: URL of HTTP(s) proxy used when fill_in is True
+    :param keep_alive: whether requests to the auth system should reuse
+           HTTP connections rather than close them per request
     :param kwargs (dict): Dict of credential key/value pairs
 
     Examples:
@@ -649,7 +654,8 @@ def get_credentials(auth_url, fill_in=True, identity_version='v2',
         auth_provider = auth_provider_class(
             creds, auth_url, disable_ssl_certificate_validation=dscv,
             ca_certs=ca_certs, trace_requests=trace_requests,
-            http_timeout=http_timeout, proxy_url=proxy_url)
+            http_timeout=http_timeout, proxy_url=proxy_url,
+            keep_alive=keep_alive)
         creds = auth_provider.fill_credentials()
     return creds
 
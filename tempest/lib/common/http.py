@@ -18,8 +18,10 @@ import urllib3
 
 class ClosingProxyHttp(urllib3.ProxyManager):
     def __init__(self, proxy_url, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=False):
         self.follow_redirects = follow_redirects
+        self.keep_alive = keep_alive
         kwargs = {}
 
         if disable_ssl_certificate_validation:
@@ -47,7 +49,11 @@ class ClosingProxyHttp(urllib3.ProxyManager):
                 self['content-location'] = url
 
         original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
+        # Connections are closed per request by default; with keep_alive
+        # the urllib3 pool reuses them, saving a TCP+TLS handshake per
+        # request.
+        connection = 'keep-alive' if self.keep_alive else 'close'
+        new_headers = dict(original_headers, connection=connection)
         new_kwargs = dict(kwargs, headers=new_headers)
 
         if self.follow_redirects:
@@ -70,8 +76,10 @@ class ClosingProxyHttp(urllib3.ProxyManager):
 
 class ClosingHttp(urllib3.poolmanager.PoolManager):
     def __init__(self, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=False):
         self.follow_redirects = follow_redirects
+        self.keep_alive = keep_alive
         kwargs = {}
 
         if disable_ssl_certificate_validation:
@@ -101,7 +109,11 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
                 self['content-location'] = url
 
         original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
+        # Connections are closed per request by default; with keep_alive
+        # the urllib3 pool reuses them, saving a TCP+TLS handshake per
+        # request.
+        connection = 'keep-alive' if self.keep_alive else 'close'
+        new_headers = dict(original_headers, connection=connection)
         new_kwargs = dict(kwargs, headers=new_headers)
 
         if self.follow_redirects:
@@ -15,6 +15,7 @@
 
 import itertools
 import random
+import secrets
 import string
 import uuid
 
@@ -170,8 +171,7 @@ def random_bytes(size=1024):
     """
     if size > 1 << 20:
         raise RuntimeError('Size should be less than 1MiB')
-    return b''.join([bytes((random.randint(0, 255),))
-                     for i in range(size)])
+    return secrets.token_bytes(size)
 
 
 # Courtesy of http://stackoverflow.com/a/312464
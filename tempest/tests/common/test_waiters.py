@@ -151,6 +151,7 @@ class TestImageWaiters(base.TestCase):
         time_mock = self.patch('time.time')
         client = mock.MagicMock()
         client.build_timeout = 2
+        client.build_interval = 1
         self.patch('time.time', side_effect=[0., 1., 2.])
         time_mock.side_effect = utils.generate_timeout_series(1)
 
@@ -166,6 +167,7 @@ class TestImageWaiters(base.TestCase):
         time_mock = self.patch('time.time')
         client = mock.MagicMock()
         client.build_timeout = 2
+        client.build_interval = 1
         self.patch('time.time', side_effect=[0., 1., 2.])
         time_mock.side_effect = utils.generate_timeout_series(1)
 
@@ -181,6 +183,7 @@ class TestImageWaiters(base.TestCase):
         client.show_image.return_value = ({'status': 'active'})
         client.info_stores.side_effect = lib_exc.NotFound
         client.build_timeout = 2
+        client.build_interval = 1
         start_time = time.time()
         waiters.wait_for_image_imported_to_stores(
             client, 'fake_image_id', None)
@@ -99,6 +99,26 @@ class TestClosingHttp(base.TestCase):
         self.assertEqual(http_response.version, response.version)
         self.assertEqual(http_response.data, data)
 
+    def test_request_with_keep_alive(self):
+        # Given
+        connection = self.closing_http(keep_alive=True)
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        retry = self.patch('urllib3.util.Retry')
+
+        # When
+        connection.request(
+            method=REQUEST_METHOD,
+            url=REQUEST_URL)
+
+        # Then
+        request.assert_called_once_with(
+            REQUEST_METHOD,
+            REQUEST_URL,
+            headers={'connection': 'keep-alive'},
+            retries=retry(raise_on_redirect=False, redirect=5))
+
     def test_request_with_fields(self):
         # Given
         connection = self.closing_http()